@@ -2,46 +2,118 @@
 from __future__ import annotations
 
 import logging
-from collections.abc import AsyncIterator, Callable
-from typing import Any, Dict, Optional
+import os
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 
 import httpx
-from fastapi import Depends, FastAPI, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, BaseSettings, Field, HttpUrl
+import msgspec
+import orjson
+from dotenv import dotenv_values
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response
+from pydantic import BaseModel, Field
 from sse_starlette.sse import EventSourceResponse
 
 logger = logging.getLogger("mcp_server")
-logging.basicConfig(level=logging.INFO)
 
 
-class Settings(BaseSettings):
-    """Application settings loaded from environment variables."""
+def configure_logging(level: int = logging.INFO) -> None:
+    """Configure root logging; called on startup rather than at import time."""
+    logging.basicConfig(level=level)
 
-    n8n_base_url: HttpUrl = Field(
-        default="http://localhost:5678/api/v1/",
-        description="Base URL for the n8n REST API.",
-        env=["N8N_URL", "N8N_BASE_URL"],
-    )
-    n8n_api_key: Optional[str] = Field(
-        default=None,
-        description="API key for authenticating against n8n.",
-        env=["N8N_API_KEY", "N8N_API_TOKEN"],
-    )
-    n8n_timeout: float = Field(default=30.0, description="HTTP timeout in seconds.")
 
-    class Config:
-        case_sensitive = False
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+def _env(environ: Dict[str, str], *names: str) -> Optional[str]:
+    for name in names:
+        value = environ.get(name)
+        if value:
+            return value
+    return None
 
 
-settings = Settings()
-
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Application settings loaded from environment variables."""
 
-class ListWorkflowsParams(BaseModel):
-    limit: Optional[int] = Field(default=None, ge=1, description="Maximum number of workflows to fetch.")
-    offset: Optional[int] = Field(default=None, ge=0, description="Offset for pagination.")
+    n8n_base_url: str = "http://localhost:5678/api/v1/"
+    n8n_api_key: Optional[str] = None
+    n8n_timeout: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """Read settings from the environment, falling back to ``.env`` for unset variables."""
+        # Names are matched case-insensitively, and real environment variables win over ``.env``.
+        environ = {
+            key.upper(): value
+            for key, value in dotenv_values(".env", encoding="utf-8").items()
+            if value is not None
+        }
+        environ.update((key.upper(), value) for key, value in os.environ.items())
+        values: Dict[str, Any] = {}
+        base_url = _env(environ, "N8N_URL", "N8N_BASE_URL")
+        if base_url:
+            values["n8n_base_url"] = base_url
+        api_key = _env(environ, "N8N_API_KEY", "N8N_API_TOKEN")
+        if api_key:
+            values["n8n_api_key"] = api_key
+        timeout = _env(environ, "N8N_TIMEOUT")
+        if timeout:
+            values["n8n_timeout"] = float(timeout)
+        return cls(**values)
+
+
+@lru_cache(maxsize=None)
+def get_settings() -> Settings:
+    return Settings.from_env()
+
+
+settings = get_settings()
+
+
+def _int_param(params: Dict[str, Any], name: str, minimum: int) -> Optional[int]:
+    """Read an optional integer parameter, coercing like Pydantic's lax mode."""
+    value = params.get(name)
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        raise ValueError(f"{name} must be an integer")
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    elif isinstance(value, str):
+        try:
+            value = int(value.strip())
+        except ValueError:
+            raise ValueError(f"{name} must be an integer") from None
+    if not isinstance(value, int):
+        raise ValueError(f"{name} must be an integer")
+    if value < minimum:
+        raise ValueError(f"{name} must be greater than or equal to {minimum}")
+    return value
+
+
+def _str_param(params: Dict[str, Any], name: str) -> str:
+    """Read a required string parameter."""
+    value = params.get(name)
+    if value is None:
+        raise ValueError(f"{name} is required")
+    if not isinstance(value, str):
+        raise ValueError(f"{name} must be a string")
+    return value
+
+
+# Simple params are slotted dataclasses; ``from_params`` ignores unknown keys like the
+# Pydantic models do, and validates before constructing.
+@dataclass(frozen=True, slots=True)
+class ListWorkflowsParams:
+    limit: Optional[int] = None  # Maximum number of workflows to fetch.
+    offset: Optional[int] = None  # Offset for pagination.
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any]) -> "ListWorkflowsParams":
+        return cls(limit=_int_param(params, "limit", 1), offset=_int_param(params, "offset", 0))
 
 
 class CreateWorkflowParams(BaseModel):
@@ -59,8 +131,13 @@ class UpdateWorkflowParams(BaseModel):
     )
 
 
-class DeleteWorkflowParams(BaseModel):
-    workflow_id: str = Field(..., description="Identifier of the workflow to delete.")
+@dataclass(frozen=True, slots=True)
+class DeleteWorkflowParams:
+    workflow_id: str  # Identifier of the workflow to delete.
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any]) -> "DeleteWorkflowParams":
+        return cls(workflow_id=_str_param(params, "workflow_id"))
 
 
 class RunWorkflowParams(BaseModel):
@@ -74,8 +151,13 @@ class RunWorkflowParams(BaseModel):
     )
 
 
-class GetExecutionStatusParams(BaseModel):
-    execution_id: str = Field(..., description="Execution identifier returned by n8n.")
+@dataclass(frozen=True, slots=True)
+class GetExecutionStatusParams:
+    execution_id: str  # Execution identifier returned by n8n.
+
+    @classmethod
+    def from_params(cls, params: Dict[str, Any]) -> "GetExecutionStatusParams":
+        return cls(execution_id=_str_param(params, "execution_id"))
 
 
 class MCPRequest(BaseModel):
@@ -87,6 +169,17 @@ class MCPRequest(BaseModel):
     params: Dict[str, Any] = Field(default_factory=dict, description="Method-specific parameters.")
 
 
+class MCPRequestStruct(msgspec.Struct):
+    """msgspec mirror of :class:`MCPRequest` used to decode request bodies on the hot path."""
+
+    id: str
+    method: str
+    params: Dict[str, Any] = msgspec.field(default_factory=dict)
+
+
+_MCP_REQUEST_DECODER = msgspec.json.Decoder(MCPRequestStruct)
+
+
 class MCPError(BaseModel):
     code: str
     message: str
@@ -99,68 +192,123 @@ class MCPResponse(BaseModel):
     error: Optional[MCPError] = None
 
 
+@lru_cache(maxsize=256)
+def _list_params(limit: Optional[int], offset: Optional[int]) -> Optional[Tuple[Tuple[str, int], ...]]:
+    """Build query params for list_workflows; a tuple so cached values cannot be mutated."""
+    items = []
+    if limit is not None:
+        items.append(("limit", limit))
+    if offset is not None:
+        items.append(("offset", offset))
+    return tuple(items) or None
+
+
+_DELETED_BODY = b'{"status":"deleted"}'
+_ETAG_CACHE_SIZE = 256
+
+
+def _json_body(response: httpx.Response) -> bytes:
+    """Return a successful n8n body that is safe to splice into an MCP result verbatim."""
+    if response.headers.get("content-type", "").startswith("application/json"):
+        return response.content
+    # Bodies not labelled as JSON must still parse (else the internal_error path) and are re-encoded.
+    return orjson.dumps(orjson.loads(response.content))
+
+
 class N8nClient:
-    """Lightweight async wrapper around the n8n REST API."""
+    """Lightweight async wrapper around the n8n REST API.
+
+    Methods return the raw n8n response body so it can be forwarded without re-encoding.
+    """
 
     def __init__(self, http_client: httpx.AsyncClient):
         self._client = http_client
-
-    async def list_workflows(self, params: ListWorkflowsParams) -> Dict[str, Any]:
-        logger.debug("Listing workflows with params=%s", params.dict())
+        # (limit, offset) -> (etag, body) for conditional list_workflows requests, oldest first.
+        self._etag_cache: OrderedDict[Tuple[Optional[int], Optional[int]], Tuple[str, bytes]] = OrderedDict()
+
+    async def list_workflows(self, params: ListWorkflowsParams) -> bytes:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Listing workflows with params=%s", params)
+        key = (params.limit, params.offset)
+        cached = self._etag_cache.get(key)
         response = await self._client.get(
-            "rest/workflows", params=params.dict(exclude_none=True) or None
+            "rest/workflows",
+            params=_list_params(params.limit, params.offset),
+            headers={"If-None-Match": cached[0]} if cached else None,
         )
+        if cached and response.status_code == 304:
+            self._etag_cache.move_to_end(key)
+            return cached[1]
         response.raise_for_status()
-        return response.json()
-
-    async def create_workflow(self, params: CreateWorkflowParams) -> Dict[str, Any]:
-        logger.debug("Creating workflow with payload keys=%s", list(params.workflow.keys()))
+        body = _json_body(response)
+        etag = response.headers.get("etag")
+        if etag:
+            self._etag_cache[key] = (etag, body)
+            self._etag_cache.move_to_end(key)
+            if len(self._etag_cache) > _ETAG_CACHE_SIZE:
+                self._etag_cache.popitem(last=False)
+        else:
+            self._etag_cache.pop(key, None)
+        return body
+
+    async def create_workflow(self, params: CreateWorkflowParams) -> bytes:
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Creating workflow with payload keys=%s", list(params.workflow.keys()))
         response = await self._client.post("rest/workflows", json=params.workflow)
         response.raise_for_status()
-        return response.json()
+        return _json_body(response)
 
-    async def update_workflow(self, params: UpdateWorkflowParams) -> Dict[str, Any]:
+    async def update_workflow(self, params: UpdateWorkflowParams) -> bytes:
         logger.debug("Updating workflow %s", params.workflow_id)
         response = await self._client.patch(
             f"rest/workflows/{params.workflow_id}", json=params.workflow
         )
         response.raise_for_status()
-        return response.json()
+        return _json_body(response)
 
-    async def delete_workflow(self, params: DeleteWorkflowParams) -> Dict[str, Any]:
+    async def delete_workflow(self, params: DeleteWorkflowParams) -> bytes:
         logger.debug("Deleting workflow %s", params.workflow_id)
         response = await self._client.delete(f"rest/workflows/{params.workflow_id}")
         response.raise_for_status()
-        return response.json() if response.content else {"status": "deleted"}
+        return _json_body(response) if response.content else _DELETED_BODY
 
-    async def run_workflow(self, params: RunWorkflowParams) -> Dict[str, Any]:
+    async def run_workflow(self, params: RunWorkflowParams) -> bytes:
         logger.debug("Running workflow %s", params.workflow_id)
-        payload = dict(params.payload)
-        if params.workflow_id:
-            payload.setdefault("workflowId", params.workflow_id)
-        response = await self._client.post("rest/workflows/run", json=payload or None)
+        if params.workflow_id and "workflowId" not in params.payload:
+            payload = {**params.payload, "workflowId": params.workflow_id}
+        else:
+            payload = params.payload or None
+        response = await self._client.post("rest/workflows/run", json=payload)
         response.raise_for_status()
-        return response.json()
+        return _json_body(response)
 
-    async def get_execution_status(self, params: GetExecutionStatusParams) -> Dict[str, Any]:
+    async def get_execution_status(self, params: GetExecutionStatusParams) -> bytes:
         logger.debug("Fetching execution status for %s", params.execution_id)
         response = await self._client.get(f"rest/executions/{params.execution_id}")
         response.raise_for_status()
-        return response.json()
+        return _json_body(response)
 
 
 async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    configure_logging()
     headers = {}
     if settings.n8n_api_key:
         headers["X-N8N-API-KEY"] = settings.n8n_api_key
 
     client = httpx.AsyncClient(
-        base_url=str(settings.n8n_base_url),
+        base_url=settings.n8n_base_url,
         headers=headers,
         timeout=settings.n8n_timeout,
+        http2=True,
+        limits=httpx.Limits(
+            max_connections=100,
+            max_keepalive_connections=20,
+            keepalive_expiry=30.0,
+        ),
     )
     app.state.n8n_client = N8nClient(client)
     logger.info("Initialised n8n client with base URL %s", settings.n8n_base_url)
+    logger.info("Serving discovery payload: %s", _DISCOVER_PAYLOAD)
     try:
         yield
     finally:
@@ -171,104 +319,168 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
 app = FastAPI(title="MCP n8n bridge", lifespan=lifespan)
 
 
-def get_n8n_client() -> N8nClient:
-    return app.state.n8n_client  # type: ignore[attr-defined]
+_DISCOVER_PAYLOAD: Dict[str, Any] = {
+    "name": "n8n MCP bridge",
+    "version": "1.0.0",
+    "capabilities": {
+        "sse": True,
+        "methods": [
+            "list_workflows",
+            "create_workflow",
+            "update_workflow",
+            "delete_workflow",
+            "run_workflow",
+            "get_execution_status",
+        ],
+    },
+}
+# Both payloads are static for the process lifetime, so serialise them once.
+_DISCOVER_BYTES = orjson.dumps(_DISCOVER_PAYLOAD)
+_HEALTHZ_BYTES = orjson.dumps({"status": "ok"})
 
 
 @app.get("/mcp/discover")
-async def discover() -> JSONResponse:
+async def discover() -> Response:
     """Return MCP capability description."""
-    payload = {
-        "name": "n8n MCP bridge",
-        "version": "1.0.0",
-        "capabilities": {
-            "sse": True,
-            "methods": [
-                "list_workflows",
-                "create_workflow",
-                "update_workflow",
-                "delete_workflow",
-                "run_workflow",
-                "get_execution_status",
-            ],
-        },
-    }
-    logger.info("Discovery requested: %s", payload)
-    return JSONResponse(payload)
-
-
-METHOD_PARAM_MODELS: Dict[str, Callable[[Dict[str, Any]], BaseModel]] = {
-    "list_workflows": ListWorkflowsParams.parse_obj,
+    return Response(content=_DISCOVER_BYTES, media_type="application/json")
+
+
+METHOD_PARAM_MODELS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    "list_workflows": ListWorkflowsParams.from_params,
     "create_workflow": CreateWorkflowParams.parse_obj,
     "update_workflow": UpdateWorkflowParams.parse_obj,
-    "delete_workflow": DeleteWorkflowParams.parse_obj,
+    "delete_workflow": DeleteWorkflowParams.from_params,
     "run_workflow": RunWorkflowParams.parse_obj,
-    "get_execution_status": GetExecutionStatusParams.parse_obj,
+    "get_execution_status": GetExecutionStatusParams.from_params,
+}
+
+
+# Parser and unbound handler per method, resolved once at import time.
+_DISPATCH: Dict[str, Tuple[Callable[[Dict[str, Any]], Any], Callable[..., Awaitable[bytes]]]] = {
+    method: (parser, getattr(N8nClient, method)) for method, parser in METHOD_PARAM_MODELS.items()
 }
 
 
-async def dispatch_request(request: MCPRequest, client: N8nClient) -> Dict[str, Any]:
-    if request.method not in METHOD_PARAM_MODELS:
+async def dispatch_request(request: MCPRequestStruct, client: N8nClient) -> bytes:
+    entry = _DISPATCH.get(request.method)
+    if entry is None:
         logger.error("Unsupported MCP method: %s", request.method)
         raise HTTPException(status_code=400, detail=f"Unsupported method: {request.method}")
 
-    parser = METHOD_PARAM_MODELS[request.method]
-    params_model = parser(request.params)
-    handler = getattr(client, request.method)
-    logger.info("Dispatching method=%s id=%s", request.method, request.id)
-    return await handler(params_model)
+    parser, handler = entry
+    try:
+        params_model = parser(request.params)
+    except ValueError as exc:  # includes Pydantic's ValidationError
+        raise HTTPException(status_code=400, detail=f"Invalid params for {request.method}: {exc}") from exc
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Dispatching method=%s id=%s", request.method, request.id)
+    return await handler(client, params_model)
+
+
+def _error_body(
+    id: str,
+    code: str,
+    message: str,
+    details: Optional[Dict[str, Any]] = None,
+) -> bytes:
+    """Encode an MCP error response directly, without building Pydantic models."""
+    return orjson.dumps(
+        {"id": id, "result": None, "error": {"code": code, "message": message, "details": details}}
+    )
 
 
-@app.post("/mcp/request")
-async def handle_mcp_request(request: MCPRequest, client: N8nClient = Depends(get_n8n_client)) -> EventSourceResponse:
-    logger.info("Received MCP request id=%s method=%s", request.id, request.method)
+_RESULT_OPEN = b'{"id":'
+_RESULT_DATA = b',"result":{"type":"json_schema","data":'
+_RESULT_CLOSE = b'},"error":null}'
 
-    async def event_publisher() -> AsyncIterator[Dict[str, str]]:
-        try:
-            result = await dispatch_request(request, client)
-            response = MCPResponse(
-                id=request.id,
-                result={
-                    "type": "json_schema",
-                    "data": result,
-                },
-            )
-            logger.info("MCP request id=%s succeeded", request.id)
-            yield {
-                "event": "result",
-                "data": response.json(),
-            }
-        except httpx.HTTPStatusError as exc:
-            error = MCPError(
-                code=str(exc.response.status_code),
-                message="n8n API returned an error",
-                details={
-                    "response": exc.response.json() if exc.response.content else None,
-                },
-            )
+
+def _result_body(id: str, raw: bytes) -> bytes:
+    """Wrap an already-encoded n8n body in an MCP result without decoding it."""
+    # A single join copies the (possibly large) body once instead of once per ``+``.
+    return b"".join((_RESULT_OPEN, orjson.dumps(id), _RESULT_DATA, raw or b"null", _RESULT_CLOSE))
+
+
+# sse-starlette passes bytes through untouched, so event headers are encoded once here.
+_SSE_EVENT_PREFIXES = {
+    "result": b"event: result\r\ndata: ",
+    "error": b"event: error\r\ndata: ",
+}
+_SSE_FRAME_END = b"\r\n\r\n"
+
+
+def _sse_frame(event: str, body: bytes) -> bytes:
+    """Encode a single-line SSE frame for an already-encoded JSON body."""
+    if b"\n" in body or b"\r" in body:
+        # Raw line breaks in JSON can only be insignificant whitespace; keep the data on one line.
+        body = body.replace(b"\r", b" ").replace(b"\n", b" ")
+    return b"".join((_SSE_EVENT_PREFIXES[event], body, _SSE_FRAME_END))
+
+
+def _error_response_details(content: bytes) -> Any:
+    """Decode an n8n error body, keeping non-JSON bodies (e.g. proxy HTML pages) as text."""
+    if not content:
+        return None
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        return content.decode(errors="replace")
+
+
+async def process_request(request: MCPRequestStruct, client: N8nClient) -> Tuple[str, bytes]:
+    """Dispatch an MCP request and return the event name and encoded MCP response."""
+    try:
+        result = await dispatch_request(request, client)
+    except HTTPException as exc:
+        return "error", _error_body(request.id, "invalid_request", str(exc.detail))
+    except httpx.HTTPError as exc:
+        if isinstance(exc, httpx.HTTPStatusError):
             logger.exception("n8n API error for request id=%s", request.id)
-            yield {
-                "event": "error",
-                "data": MCPResponse(id=request.id, error=error).json(),
-            }
-        except httpx.HTTPError as exc:
-            error = MCPError(code="http_error", message=str(exc))
-            logger.exception("HTTP error for request id=%s", request.id)
-            yield {
-                "event": "error",
-                "data": MCPResponse(id=request.id, error=error).json(),
-            }
-        except Exception as exc:  # pragma: no cover - catch-all for robustness
-            error = MCPError(code="internal_error", message=str(exc))
-            logger.exception("Internal error for request id=%s", request.id)
-            yield {
-                "event": "error",
-                "data": MCPResponse(id=request.id, error=error).json(),
-            }
+            return "error", _error_body(
+                request.id,
+                str(exc.response.status_code),
+                "n8n API returned an error",
+                {"response": _error_response_details(exc.response.content)},
+            )
+        logger.exception("HTTP error for request id=%s", request.id)
+        return "error", _error_body(request.id, "http_error", str(exc))
+    except Exception as exc:  # pragma: no cover - catch-all for robustness
+        logger.exception("Internal error for request id=%s", request.id)
+        return "error", _error_body(request.id, "internal_error", str(exc))
+
+    return "result", _result_body(request.id, result)
+
+
+@app.post(
+    "/mcp/request",
+    # The body is decoded with msgspec; the Pydantic model only documents it in OpenAPI.
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": MCPRequest.model_json_schema()}},
+        }
+    },
+)
+async def handle_mcp_request(http_request: Request) -> Response:
+    client: N8nClient = http_request.app.state.n8n_client
+    try:
+        request = _MCP_REQUEST_DECODER.decode(await http_request.body())
+    except msgspec.DecodeError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Received MCP request id=%s method=%s", request.id, request.method)
+
+    # The reply is a single message, so only clients that ask for SSE get the stream.
+    if "text/event-stream" not in http_request.headers.get("accept", ""):
+        _, body = await process_request(request, client)
+        return Response(content=body, media_type="application/json")
+
+    async def event_publisher() -> AsyncIterator[bytes]:
+        event, body = await process_request(request, client)
+        yield _sse_frame(event, body)
 
     return EventSourceResponse(event_publisher())
 
 
 @app.get("/healthz")
-async def healthcheck() -> Dict[str, str]:
-    return {"status": "ok"}
+async def healthcheck() -> Response:
+    return Response(content=_HEALTHZ_BYTES, media_type="application/json")